@@ -0,0 +1,29 @@
+#!/usr/bin/python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+#
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+
+import os
+import subprocess
+import sys
+
+folder = "third-party"
+
+
+def deploy(json_name, base_name, extra_args=()):
+    script = os.path.join(folder, "bootstrap.py")
+    json = os.path.join(folder, json_name)
+    base = os.path.join(folder, base_name)
+
+    try:
+        os.mkdir(base)
+    except FileExistsError:
+        pass
+
+    subprocess.run(
+        [sys.executable, script, "-b", base, "--bootstrap-file={}".format(json)]
+        + list(extra_args),
+        check=True,
+    )
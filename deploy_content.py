@@ -5,19 +5,6 @@
 # LICENSE file in the root directory of this source tree.
 
 
-import os
-import sys
+from _deploy import deploy
 
-folder = "third-party"
-script = os.path.join(folder, "bootstrap.py")
-json = os.path.join(folder, "bootstrap-content.json")
-base = os.path.join(folder, "content")
-
-try:
-    os.mkdir(base)
-except FileExistsError:
-    pass
-
-os.system(
-    '"{}" {} -b {} --bootstrap-file={}'.format(sys.executable, script, base, json)
-)
+deploy("bootstrap-content.json", "content")
@@ -5,16 +5,6 @@
 # LICENSE file in the root directory of this source tree.
 
 
-import os
-import sys
+from _deploy import deploy
 
-folder = "third-party"
-script = os.path.join(folder, "bootstrap.py")
-json = os.path.join(folder, "bootstrap-deps.json")
-base = os.path.join(folder, "deps")
-
-os.system(
-    '"{}" {} -b {} --bootstrap-file={} --break-on-first-error'.format(
-        sys.executable, script, base, json
-    )
-)
+deploy("bootstrap-deps.json", "deps", extra_args=("--break-on-first-error",))
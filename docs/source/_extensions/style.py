@@ -12,4 +12,8 @@ def setup(app):
 
     ws_filter = VisibleWhitespaceFilter(tabs=" ", tabsize=4)
     for lx in lexers.values():
-        lx.add_filter(ws_filter)
+        # setup() can run more than once (e.g. under sphinx-autobuild); avoid
+        # stacking duplicate filters on lexers that already have one.
+        if not getattr(lx, "_ws_filter_applied", False):
+            lx.add_filter(ws_filter)
+            lx._ws_filter_applied = True
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+import filecmp
+import os
+import re
+import shutil
+from pathlib import Path
+
+base_dir=os.getcwd()
+lib_dir=os.path.join(base_dir, "src", "bc7enc")
+
+def copy_if_changed(name):
+    src = os.path.join(base_dir, "patches", name)
+    dst = os.path.join(lib_dir, name)
+    if not (os.path.isfile(dst) and filecmp.cmp(src, dst, shallow=False)):
+        shutil.copyfile(src, dst)
+
+copy_if_changed("Compress.h")
+copy_if_changed("Compress.cpp")
+
+replacements = {
+  '-Wextra': '-Wextra -Wno-unused-function -Wno-unused-variable',
+  'VERSION 2.8': 'VERSION 3.0',
+  'test.cpp': 'Compress.cpp',
+  'add_executable': 'add_library',
+}
+
+# apply all replacements in one scan instead of one full-text pass per pair,
+# and skip the write entirely when the file was already patched
+file = Path(os.path.join(lib_dir, "CMakeLists.txt"))
+text = file.read_text()
+if 'add_library' not in text:
+    pattern = re.compile('|'.join(re.escape(old) for old in replacements))
+    file.write_text(pattern.sub(lambda m: replacements[m.group(0)], text))